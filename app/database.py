@@ -1,12 +1,19 @@
 """SQLite database setup and operations"""
 import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
-DATABASE_PATH = "issues.db"
+# File path or SQLite URI (e.g. "file:test?mode=memory&cache=shared")
+DATABASE_PATH = os.getenv("DATABASE_PATH", "issues.db")
+
+# Single shared connection so SQLite's page cache survives between requests
+_connection: Optional[sqlite3.Connection] = None
+_connection_lock = threading.RLock()
 
 
 def init_db() -> None:
@@ -15,6 +22,9 @@ def init_db() -> None:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
+            # WAL persists in the database file, so it only needs setting once
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Create issues table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS issues (
@@ -24,15 +34,48 @@ def init_db() -> None:
                     body TEXT,
                     html_url TEXT NOT NULL,
                     created_at TEXT NOT NULL,
-                    cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    page INTEGER
                 )
             """)
             
-            # Create index for faster repo lookups
+            # Results page each issue came from, so a 304 for that page can
+            # keep its rows; added to databases created before the column
+            if "page" not in _column_names(cursor, "issues"):
+                cursor.execute("ALTER TABLE issues ADD COLUMN page INTEGER")
+            
+            # Serves repo lookups and lets newest-first reads walk the index
+            # in order; it supersedes the old single-column idx_repo
+            cursor.execute("DROP INDEX IF EXISTS idx_repo")
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_repo ON issues(repo)
+                CREATE INDEX IF NOT EXISTS idx_repo_created ON issues(repo, created_at DESC)
             """)
             
+            # GitHub ETags per results page; the page's issues stay in the
+            # issues table, so a 304 Not Modified keeps them as they are
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS etags (
+                    repo TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    etag TEXT NOT NULL,
+                    last_page INTEGER NOT NULL,
+                    issue_count INTEGER NOT NULL,
+                    PRIMARY KEY (repo, page)
+                )
+            """)
+            
+            # LLM analyses keyed by a digest of repo, prompt and issues
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Refresh planner statistics so the compound index is chosen
+            cursor.execute("ANALYZE")
+            
             conn.commit()
             logger.info("Database initialized successfully")
             
@@ -41,51 +84,125 @@ def init_db() -> None:
         raise
 
 
+def _column_names(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    """Return the column names of a table (empty if it does not exist)"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Return the shared connection, opening it on first use"""
+    global _connection
+    if _connection is None:
+        conn = sqlite3.connect(
+            DATABASE_PATH,
+            check_same_thread=False,
+            isolation_level=None,
+            uri=True
+        )
+        
+        # Connection-scoped tuning
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        
+        _connection = conn
+    return _connection
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+    """Context manager for the shared database connection"""
+    # Serialize access so one thread's transaction never interleaves with another's
+    with _connection_lock:
+        yield _get_connection()
+
 
+def close_db() -> None:
+    """Close the shared database connection"""
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
 
-def cache_issues(repo: str, issues: List[Dict[str, Any]]) -> bool:
+
+def cache_issues(
+    repo: str,
+    issues: List[Dict[str, Any]],
+    unchanged_pages: Sequence[int] = (),
+    page_etags: Sequence[Tuple[int, str, int, int]] = ()
+) -> bool:
     """
     Cache GitHub issues in the database
     
+    Issues and page ETags are written in one transaction, so a stored
+    ETag always matches the issue rows cached for its page.
+    
     Args:
         repo: Repository name in format 'owner/repo'
         issues: List of issue dictionaries from GitHub API
+        unchanged_pages: Pages GitHub reported as not modified; their
+            cached issues are kept instead of being replaced
+        page_etags: List of (page, etag, last page, issue count) tuples
+            to store for the next scan
         
     Returns:
         True if caching was successful
     """
+    rows = [
+        (
+            issue['id'],
+            repo,
+            issue['title'],
+            issue.get('body') or '',
+            issue['html_url'],
+            issue['created_at'],
+            issue.get('page')
+        )
+        for issue in issues
+    ]
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            # Delete existing issues for this repo (fresh cache)
-            cursor.execute("DELETE FROM issues WHERE repo = ?", (repo,))
-            
-            # Insert new issues
-            for issue in issues:
-                cursor.execute("""
-                    INSERT INTO issues (id, repo, title, body, html_url, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    issue['id'],
-                    repo,
-                    issue['title'],
-                    issue.get('body') or '',
-                    issue['html_url'],
-                    issue['created_at']
-                ))
+            # Single transaction so the whole refresh costs one commit
+            cursor.execute("BEGIN")
+            try:
+                # Delete existing issues for this repo (fresh cache),
+                # except those on pages that have not changed
+                if unchanged_pages:
+                    placeholders = ", ".join("?" * len(unchanged_pages))
+                    cursor.execute(f"""
+                        DELETE FROM issues
+                        WHERE repo = ? AND (page IS NULL OR page NOT IN ({placeholders}))
+                    """, (repo, *unchanged_pages))
+                else:
+                    cursor.execute("DELETE FROM issues WHERE repo = ?", (repo,))
+                
+                # Insert new issues in one batch
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO issues (id, repo, title, body, html_url, created_at, page)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                
+                cursor.execute("DELETE FROM etags WHERE repo = ?", (repo,))
+                cursor.executemany("""
+                    INSERT INTO etags (repo, page, etag, last_page, issue_count)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(repo, *page_etag) for page_etag in page_etags])
+                
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
             
-            conn.commit()
-            logger.info(f"Cached {len(issues)} issues for repo: {repo}")
+            logger.info(
+                f"Cached {len(rows)} issues for repo: {repo}"
+                f" ({len(unchanged_pages)} unchanged pages kept)"
+            )
             return True
             
     except sqlite3.Error as e:
@@ -93,34 +210,39 @@ def cache_issues(repo: str, issues: List[Dict[str, Any]]) -> bool:
         return False
 
 
-def get_cached_issues(repo: str) -> Optional[List[Dict[str, Any]]]:
+def get_cached_issues(repo: str, limit: Optional[int] = None) -> Optional[List[Tuple[str, str, str, str]]]:
     """
     Retrieve cached issues for a repository
     
     Args:
         repo: Repository name in format 'owner/repo'
+        limit: Maximum number of most recent issues to return
         
     Returns:
-        List of issue dictionaries or None if not found
+        List of (title, body, html_url, created_at) tuples, newest first,
+        or None if not found
     """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, repo, title, body, html_url, created_at
+            query = """
+                SELECT title, body, html_url, created_at
                 FROM issues
                 WHERE repo = ?
                 ORDER BY created_at DESC
-            """, (repo,))
+            """
+            params: Tuple[Any, ...] = (repo,)
+            if limit is not None:
+                query += " LIMIT ?"
+                params += (limit,)
+            cursor.execute(query, params)
             
-            rows = cursor.fetchall()
+            issues = cursor.fetchall()
             
-            if not rows:
+            if not issues:
                 logger.warning(f"No cached issues found for repo: {repo}")
                 return None
             
-            # Convert to list of dictionaries
-            issues = [dict(row) for row in rows]
             logger.info(f"Retrieved {len(issues)} cached issues for repo: {repo}")
             return issues
             
@@ -134,13 +256,105 @@ def repo_exists_in_cache(repo: str) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
+            # Stops at the first matching index entry instead of counting
             cursor.execute(
-                "SELECT COUNT(*) FROM issues WHERE repo = ? LIMIT 1",
+                "SELECT 1 FROM issues WHERE repo = ? LIMIT 1",
                 (repo,)
             )
-            count = cursor.fetchone()[0]
-            return count > 0
+            return cursor.fetchone() is not None
             
     except sqlite3.Error as e:
         logger.error(f"Error checking repo existence: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def get_page_etags(repo: str) -> Dict[int, Tuple[str, int, int]]:
+    """
+    Retrieve stored GitHub ETags for a repository's issue pages
+    
+    Args:
+        repo: Repository name in format 'owner/repo'
+        
+    Returns:
+        Mapping of page number to (etag, last page, issue count)
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT page, etag, last_page, issue_count FROM etags WHERE repo = ?",
+                (repo,)
+            )
+            return {
+                page: (etag, last_page, issue_count)
+                for page, etag, last_page, issue_count in cursor.fetchall()
+            }
+            
+    except sqlite3.Error as e:
+        logger.error(f"Error retrieving page ETags: {e}")
+        return {}
+
+
+def get_cached_analysis(key: str, max_age_seconds: int) -> Optional[str]:
+    """
+    Retrieve a cached LLM analysis if it has not expired
+    
+    Args:
+        key: Analysis cache key
+        max_age_seconds: Maximum age of a usable entry
+        
+    Returns:
+        Analysis text or None if not cached
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT analysis FROM analysis_cache
+                WHERE key = ? AND created_at >= datetime('now', ?)
+            """, (key, f"-{max_age_seconds} seconds"))
+            row = cursor.fetchone()
+            return row[0] if row else None
+            
+    except sqlite3.Error as e:
+        logger.error(f"Error retrieving cached analysis: {e}")
+        return None
+
+
+def cache_analysis(key: str, analysis: str) -> bool:
+    """
+    Store an LLM analysis in the cache
+    
+    Args:
+        key: Analysis cache key
+        analysis: Analysis text
+        
+    Returns:
+        True if caching was successful
+    """
+    try:
+        with get_db_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, analysis) VALUES (?, ?)",
+                (key, analysis)
+            )
+            return True
+            
+    except sqlite3.Error as e:
+        logger.error(f"Error caching analysis: {e}")
+        return False
+
+
+def purge_expired_analyses(max_age_seconds: int) -> None:
+    """Delete cached analyses older than max_age_seconds"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < datetime('now', ?)",
+                (f"-{max_age_seconds} seconds",)
+            )
+            if cursor.rowcount:
+                logger.info(f"Purged {cursor.rowcount} expired analyses")
+            
+    except sqlite3.Error as e:
+        logger.error(f"Error purging analysis cache: {e}")
\ No newline at end of file
@@ -1,114 +1,224 @@
 """GitHub API client for fetching repository issues"""
-import requests
+import asyncio
+import httpx
 import logging
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# orjson parses the raw response bytes much faster; stdlib json also accepts bytes
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 logger = logging.getLogger(__name__)
 
 GITHUB_API_BASE = "https://api.github.com"
+MAX_CONCURRENT_PAGES = 8
+
+# Issue fields kept from the API payload (all that caching needs)
+ISSUE_FIELDS = ("id", "title", "body", "html_url", "created_at")
+
+# Shared client, reused across scans; pages are multiplexed over HTTP/2
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared GitHub HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=GITHUB_API_BASE,
+            headers={
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "GitHub-Issue-Analyzer"
+            },
+            timeout=30,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared GitHub HTTP client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _check_response(response: httpx.Response, repo: str, github_token: Optional[str]) -> Optional[str]:
+    """
+    Map a GitHub API response to an error message
+    
+    Returns:
+        Error message, or None if the response is usable
+    """
+    # Handle rate limiting
+    if response.status_code == 403:
+        error_msg = "GitHub API rate limit exceeded"
+        if not github_token:
+            error_msg += ". Add GITHUB_TOKEN to .env for higher limits"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Handle repository not found
+    if response.status_code == 404:
+        error_msg = f"Repository '{repo}' not found"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Handle other errors
+    if response.status_code != 200:
+        error_msg = f"GitHub API error: {response.status_code}"
+        logger.error(f"{error_msg} - {response.text}")
+        return error_msg
+    
+    return None
+
+
+def _last_page(response: httpx.Response) -> Optional[int]:
+    """Read the final page number from GitHub's Link header, if present"""
+    last = response.links.get("last")
+    if not last:
+        return None
+    return int(httpx.URL(last["url"]).params.get("page", "1"))
 
 
-def fetch_all_issues(repo: str) -> Dict[str, Any]:
+async def fetch_all_issues(
+    repo: str,
+    page_etags: Optional[Dict[int, Tuple[str, int, int]]] = None
+) -> Dict[str, Any]:
     """
     Fetch all open issues from a GitHub repository with pagination
     
+    The first page is fetched alone to learn the page count from the
+    Link header; the remaining pages are then fetched concurrently over
+    the shared client. Pages with a known ETag are requested
+    conditionally; GitHub answers unchanged ones with a bodyless 304,
+    and their issues are left to the existing cache.
+    
     Args:
         repo: Repository name in format 'owner/repo'
+        page_etags: ETags from the previous scan, as returned by
+            get_page_etags
         
     Returns:
-        Dictionary with 'success', 'issues', and 'error' keys
+        Dictionary with 'success', 'issues' (changed pages only, each
+        tagged with its 'page'), 'issues_count' (all open issues),
+        'unchanged_pages', 'etags' (for cache_issues) and 'error' keys
     """
     issues: List[Dict[str, Any]] = []
-    page = 1
-    per_page = 100  # GitHub's maximum per page
-    
-    # Prepare headers
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "User-Agent": "GitHub-Issue-Analyzer"
+    client = get_http_client()
+    url = f"/repos/{repo}/issues"
+    params = {
+        "state": "open",
+        "per_page": 100  # GitHub's maximum per page
     }
     
+    # Accept/User-Agent come from the shared client
+    headers = {}
+    
     # Add GitHub token if available (increases rate limit)
     github_token = os.getenv("GITHUB_TOKEN")
     if github_token:
         headers["Authorization"] = f"token {github_token}"
         logger.info("Using GitHub token for authentication")
     
-    try:
-        while True:
-            url = f"{GITHUB_API_BASE}/repos/{repo}/issues"
-            params = {
-                "state": "open",
-                "per_page": per_page,
-                "page": page
-            }
-            
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+    
+    stored_pages = page_etags or {}
+    
+    def not_modified(page: int, response: httpx.Response) -> bool:
+        return response.status_code == 304 and page in stored_pages
+    
+    async def fetch_page(page: int) -> httpx.Response:
+        page_headers = headers
+        if page in stored_pages:
+            page_headers = {**headers, "If-None-Match": stored_pages[page][0]}
+        async with semaphore:
             logger.info(f"Fetching page {page} for repo: {repo}")
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            
-            # Handle rate limiting
-            if response.status_code == 403:
-                error_msg = "GitHub API rate limit exceeded"
-                if not github_token:
-                    error_msg += ". Add GITHUB_TOKEN to .env for higher limits"
-                logger.error(error_msg)
-                return {
-                    "success": False,
-                    "issues": [],
-                    "error": error_msg
-                }
-            
-            # Handle repository not found
-            if response.status_code == 404:
-                error_msg = f"Repository '{repo}' not found"
-                logger.error(error_msg)
+            return await client.get(url, headers=page_headers, params={**params, "page": page})
+    
+    try:
+        first_response = await fetch_page(1)
+        if not not_modified(1, first_response):
+            error_msg = _check_response(first_response, repo, github_token)
+            if error_msg:
                 return {
                     "success": False,
                     "issues": [],
                     "error": error_msg
                 }
+        
+        responses = [first_response]
+        last_page = _last_page(first_response)
+        if last_page is None:
+            last_page = stored_pages[1][1] if not_modified(1, first_response) else 1
+        if last_page > 1:
+            responses.extend(await asyncio.gather(
+                *(fetch_page(page) for page in range(2, last_page + 1))
+            ))
+
+        # The stored last page may be stale when page 1 came back 304 without
+        # a Link header, so keep following rel="next" past it
+        while responses[-1].status_code == 200 and "next" in responses[-1].links:
+            last_page += 1
+            responses.append(await fetch_page(last_page))
+
+        # Merge in page order
+        issues_count = 0
+        unchanged_pages: List[int] = []
+        new_etags: List[Tuple[int, str, int, int]] = []
+        for page, response in enumerate(responses, 1):
+            if not_modified(page, response):
+                etag, _, page_count = stored_pages[page]
+                unchanged_pages.append(page)
+                new_etags.append((page, etag, last_page, page_count))
+                issues_count += page_count
+                logger.info(f"Page {page} unchanged, keeping {page_count} cached issues")
+                continue
             
-            # Handle other errors
-            if response.status_code != 200:
-                error_msg = f"GitHub API error: {response.status_code}"
-                logger.error(f"{error_msg} - {response.text}")
+            error_msg = _check_response(response, repo, github_token)
+            if error_msg:
                 return {
                     "success": False,
                     "issues": [],
                     "error": error_msg
                 }
             
-            page_issues = response.json()
-            
-            # Break if no more issues
-            if not page_issues:
-                logger.info(f"No more issues found. Total pages fetched: {page - 1}")
-                break
+            page_issues = json_loads(response.content)
             
             # Filter out pull requests (GitHub includes them in issues endpoint)
             actual_issues = [
-                issue for issue in page_issues 
-                if 'pull_request' not in issue
+                {**{field: issue.get(field) for field in ISSUE_FIELDS}, "page": page}
+                for issue in page_issues
+                if issue.get('pull_request') is None
             ]
             
+            etag = response.headers.get("ETag")
+            if etag:
+                new_etags.append((page, etag, last_page, len(actual_issues)))
+            
             issues.extend(actual_issues)
+            issues_count += len(actual_issues)
             logger.info(f"Fetched {len(actual_issues)} issues from page {page}")
-            
-            # If we got fewer than per_page items, we're done
-            if len(page_issues) < per_page:
-                break
-            
-            page += 1
         
-        logger.info(f"Successfully fetched {len(issues)} total issues for repo: {repo}")
+        logger.info(f"Successfully fetched {issues_count} total issues for repo: {repo}")
         return {
             "success": True,
             "issues": issues,
+            "issues_count": issues_count,
+            "unchanged_pages": unchanged_pages,
+            "etags": new_etags,
             "error": None
         }
         
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         error_msg = "GitHub API request timed out"
         logger.error(error_msg)
         return {
@@ -117,7 +227,7 @@ def fetch_all_issues(repo: str) -> Dict[str, Any]:
             "error": error_msg
         }
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_msg = f"Network error while fetching issues: {str(e)}"
         logger.error(error_msg)
         return {
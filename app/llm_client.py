@@ -1,30 +1,93 @@
 """Groq LLM client for analyzing GitHub issues"""
+import hashlib
+import io
 import logging
 import os
-from typing import List, Dict, Any
-from groq import Groq
+import random
+import threading
+import time
+from typing import List, Dict, Any, Iterator, Optional, Sequence
+
+import httpx
+from groq import Groq, APIConnectionError, InternalServerError, RateLimitError
 
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not groq_api_key:
-    logger.warning("GROQ_API_KEY not found in environment variables")
+# Most recent issues sent to the LLM, to stay within context limits
+MAX_ISSUES_FOR_ANALYSIS = 100
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Retry policy for transient Groq failures (connection errors, 429s, 5xx)
+GROQ_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 5.0
+RETRYABLE_GROQ_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# Issue bodies are truncated to this many characters to avoid context overflow
+MAX_BODY_CHARS = 500
+
 
-client = Groq(api_key=groq_api_key) if groq_api_key else None
+# Shared client, reused across analyses; closed on app shutdown
+_groq_client: Optional[Groq] = None
+_groq_client_lock = threading.Lock()
 
 
-def analyze_issues(issues: List[Dict[str, Any]], user_prompt: str) -> Dict[str, Any]:
+def get_groq_client() -> Optional[Groq]:
+    """
+    Return the shared Groq client, creating it on first use
+    
+    The client gets its own pooled HTTP/2 connection so retries and
+    concurrent analyses reuse the TLS session to the Groq API. A missing
+    API key is not remembered, so setting it later takes effect.
+    
+    Returns:
+        Groq client, or None if GROQ_API_KEY is not configured
+    """
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is None:
+            groq_api_key = os.getenv("GROQ_API_KEY")
+            if not groq_api_key:
+                logger.warning("GROQ_API_KEY not found in environment variables")
+                return None
+            
+            _groq_client = Groq(
+                api_key=groq_api_key,
+                # _create_completion owns retries; SDK retries would multiply them
+                max_retries=0,
+                http_client=httpx.Client(
+                    timeout=60,
+                    transport=httpx.HTTPTransport(
+                        http2=True,
+                        limits=httpx.Limits(max_keepalive_connections=20)
+                    )
+                )
+            )
+        return _groq_client
+
+
+def close_groq_client() -> None:
+    """Close the shared Groq client and its HTTP connections"""
+    global _groq_client
+    with _groq_client_lock:
+        if _groq_client is not None:
+            _groq_client.close()
+            _groq_client = None
+
+
+def analyze_issues(issues: Sequence[Sequence[Any]], user_prompt: str) -> Dict[str, Any]:
     """
     Analyze GitHub issues using Groq LLM
     
     Args:
-        issues: List of issue dictionaries
+        issues: Cached issue rows from get_cached_issues
         user_prompt: User's analysis request
         
     Returns:
         Dictionary with 'success', 'analysis', and 'error' keys
     """
+    client = get_groq_client()
     if not client:
         error_msg = "Groq API key not configured"
         logger.error(error_msg)
@@ -35,54 +98,20 @@ def analyze_issues(issues: List[Dict[str, Any]], user_prompt: str) -> Dict[str,
         }
     
     try:
-        # Handle context limits - if too many issues, limit to most recent 50
-        if len(issues) > 100:
-            logger.warning(f"Too many issues ({len(issues)}). Limiting to 50 most recent")
-            issues = issues[:50]
-        
-        # Format issues for LLM
-        issues_text = format_issues_for_llm(issues)
-        
-        # Prepare messages
-        system_prompt = (
-            "You are a GitHub issue analyzer. Analyze the provided issues "
-            "and respond to the user's request clearly and concisely. "
-            "Focus on actionable insights and patterns."
-        )
-        
-        user_message = f"{user_prompt}\n\nIssues to analyze:\n\n{issues_text}"
-        
+        messages = _build_messages(issues, user_prompt)
         logger.info(f"Sending {len(issues)} issues to Groq for analysis")
         
         # Call Groq API with retry logic
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                response = client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=2048,
-                    timeout=60
-                )
-                
-                analysis = response.choices[0].message.content
-                logger.info("Successfully received Groq analysis")
-                
-                return {
-                    "success": True,
-                    "analysis": analysis,
-                    "error": None
-                }
-                
-            except Exception as e:
-                logger.warning(f"Groq attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise
-                continue
+        response = _create_completion(client, messages)
+        
+        analysis = response.choices[0].message.content
+        logger.info("Successfully received Groq analysis")
+        
+        return {
+            "success": True,
+            "analysis": analysis,
+            "error": None
+        }
         
     except Exception as e:
         error_msg = f"LLM analysis error: {str(e)}"
@@ -94,35 +123,169 @@ def analyze_issues(issues: List[Dict[str, Any]], user_prompt: str) -> Dict[str,
         }
 
 
-def format_issues_for_llm(issues: List[Dict[str, Any]]) -> str:
+def stream_analysis(issues: Sequence[Sequence[Any]], user_prompt: str) -> Dict[str, Any]:
     """
-    Format issues into a readable text format for LLM
+    Start a streamed analysis of GitHub issues using Groq LLM
+    
+    The request (including retries) is made before returning, so
+    failures are reported up front; the text then arrives as the model
+    generates it.
     
     Args:
-        issues: List of issue dictionaries
+        issues: Cached issue rows from get_cached_issues
+        user_prompt: User's analysis request
         
     Returns:
-        Formatted string of issues
+        Dictionary with 'success', 'stream' (generator of text chunks;
+        close it to release the connection) and 'error' keys
     """
-    formatted_parts = []
+    client = get_groq_client()
+    if not client:
+        error_msg = "Groq API key not configured"
+        logger.error(error_msg)
+        return {
+            "success": False,
+            "stream": None,
+            "error": error_msg
+        }
     
-    for idx, issue in enumerate(issues, 1):
-        title = issue.get('title', 'No title')
-        body = issue.get('body', '')
-        created_at = issue.get('created_at', 'Unknown date')
-        url = issue.get('html_url', '')
+    try:
+        messages = _build_messages(issues, user_prompt)
+        logger.info(f"Streaming Groq analysis of {len(issues)} issues")
+        response = _create_completion(client, messages, stream=True)
         
-        # Truncate long bodies to avoid context overflow
-        if body and len(body) > 500:
-            body = body[:500] + "..."
+    except Exception as e:
+        error_msg = f"LLM analysis error: {str(e)}"
+        logger.error(error_msg)
+        return {
+            "success": False,
+            "stream": None,
+            "error": error_msg
+        }
+    
+    def text_chunks() -> Iterator[str]:
+        # Closing the generator releases the pooled HTTP/2 stream right away
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+    
+    return {
+        "success": True,
+        "stream": text_chunks(),
+        "error": None
+    }
+
+
+def _build_messages(issues: Sequence[Sequence[Any]], user_prompt: str) -> List[Dict[str, str]]:
+    """Build the chat messages for an analysis request"""
+    # Format issues for LLM
+    issues_text = format_issues_for_llm(issues)
+    
+    # Prepare messages
+    system_prompt = (
+        "You are a GitHub issue analyzer. Analyze the provided issues "
+        "and respond to the user's request clearly and concisely. "
+        "Focus on actionable insights and patterns."
+    )
+    
+    user_message = f"{user_prompt}\n\nIssues to analyze:\n\n{issues_text}"
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def _create_completion(client: Groq, messages: List[Dict[str, str]], stream: bool = False) -> Any:
+    """
+    Call the Groq chat completions API, retrying transient failures
+    
+    Retries back off exponentially with random jitter instead of
+    re-requesting immediately, so a rate-limited API gets time to recover.
+    Other errors are raised straight away.
+    """
+    for attempt in range(1, GROQ_MAX_ATTEMPTS + 1):
+        try:
+            return client.chat.completions.create(
+                model=GROQ_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2048,
+                timeout=60,
+                stream=stream
+            )
+        except RETRYABLE_GROQ_ERRORS as e:
+            if attempt == GROQ_MAX_ATTEMPTS:
+                raise
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            delay += random.uniform(0, RETRY_BASE_DELAY)
+            logger.warning(f"Groq attempt {attempt} failed: {e}. Retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def analysis_cache_key(repo: str, user_prompt: str, issues: Sequence[Sequence[Any]]) -> str:
+    """
+    Build the analysis cache key for a repo, prompt and set of issues
+    
+    Any change to the model, the prompt or the content of the issues
+    being analyzed produces a different key.
+    
+    Args:
+        repo: Repository name in format 'owner/repo'
+        user_prompt: User's analysis request
+        issues: Cached issue rows from get_cached_issues
         
-        issue_text = f"""Issue #{idx}:
-Title: {title}
-Created: {created_at}
-URL: {url}
-Description: {body if body else "No description provided"}
----"""
+    Returns:
+        Hex digest to use as the cache key
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (GROQ_MODEL, repo, user_prompt):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    for issue in issues:
+        for field in issue:
+            digest.update((field or "").encode())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def format_issues_for_llm(issues: Sequence[Sequence[Any]]) -> str:
+    """
+    Format issues into a readable text format for LLM
+    
+    Args:
+        issues: Rows of (title, body, html_url, created_at) as returned
+            by get_cached_issues
         
-        formatted_parts.append(issue_text)
+    Returns:
+        Formatted string of issues
+    """
+    buf = io.StringIO()
+    write = buf.write
+    limit = MAX_BODY_CHARS
+    
+    for idx, (title, body, url, created_at) in enumerate(issues, 1):
+        if idx > 1:
+            write("\n\n")
+        write("Issue #")
+        write(str(idx))
+        write(":\nTitle: ")
+        write(title)
+        write("\nCreated: ")
+        write(created_at)
+        write("\nURL: ")
+        write(url)
+        write("\nDescription: ")
+        if body:
+            # Slicing a short body is a no-op, so only the ellipsis is conditional
+            write(body[:limit])
+            if len(body) > limit:
+                write("...")
+        else:
+            write("No description provided")
+        write("\n---")
     
-    return "\n\n".join(formatted_parts)
\ No newline at end of file
+    return buf.getvalue()
\ No newline at end of file
@@ -1,27 +1,47 @@
 """FastAPI application for GitHub Issue Analyzer"""
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from typing import Iterator, List, Tuple
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 
+# Load environment variables before app modules read them at import
+load_dotenv()
+
 from app.models import (
     ScanRequest, ScanResponse,
     AnalyzeRequest, AnalyzeResponse,
     ErrorResponse
 )
-from app.database import init_db, cache_issues, get_cached_issues, repo_exists_in_cache
-from app.github_client import fetch_all_issues
-from app.llm_client import analyze_issues
+from app.database import (
+    init_db, close_db, cache_issues,
+    get_cached_issues, repo_exists_in_cache, get_page_etags,
+    get_cached_analysis, cache_analysis, purge_expired_analyses
+)
+from app.github_client import fetch_all_issues, close_http_client
+from app.llm_client import (
+    analyze_issues, stream_analysis, close_groq_client,
+    analysis_cache_key, MAX_ISSUES_FOR_ANALYSIS
+)
 from app.utils import setup_logging, validate_repo_format
 
-# Load environment variables
-load_dotenv()
+# Endpoints return this directly, skipping response_model re-validation
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# How long a cached LLM analysis is reused (seconds)
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", 86400))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,6 +53,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await close_http_client()
+    close_groq_client()
+    close_db()
 
 
 # Initialize FastAPI app
@@ -40,7 +63,8 @@ app = FastAPI(
     title="GitHub Issue Analyzer",
     description="Analyze GitHub repository issues using LLM",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 
@@ -54,7 +78,7 @@ async def root():
     }
 
 
-@app.post("/scan", response_model=ScanResponse)
+@app.post("/scan", responses={200: {"model": ScanResponse}})
 async def scan_repo(request: ScanRequest):
     """
     Fetch all open issues from a GitHub repository and cache them locally
@@ -76,8 +100,11 @@ async def scan_repo(request: ScanRequest):
     
     logger.info(f"Scanning repository: {repo}")
     
+    # ETags from the last scan let GitHub answer unchanged pages with a 304
+    page_etags = await asyncio.to_thread(get_page_etags, repo)
+    
     # Fetch issues from GitHub
-    result = fetch_all_issues(repo)
+    result = await fetch_all_issues(repo, page_etags)
     
     if not result["success"]:
         logger.error(f"Failed to fetch issues: {result['error']}")
@@ -91,10 +118,12 @@ async def scan_repo(request: ScanRequest):
         )
     
     issues = result["issues"]
-    issues_count = len(issues)
+    issues_count = result["issues_count"]
     
-    # Cache issues in database
-    cached_successfully = cache_issues(repo, issues)
+    # Cache issues in database, keeping those on unchanged pages
+    cached_successfully = await asyncio.to_thread(
+        cache_issues, repo, issues, result["unchanged_pages"], result["etags"]
+    )
     
     if not cached_successfully:
         logger.error(f"Failed to cache issues for repo: {repo}")
@@ -108,20 +137,25 @@ async def scan_repo(request: ScanRequest):
     
     logger.info(f"Successfully scanned and cached {issues_count} issues for repo: {repo}")
     
-    return ScanResponse(
-        repo=repo,
-        issues_fetched=issues_count,
-        cached_successfully=True
-    )
+    return DefaultResponse({
+        "repo": repo,
+        "issues_fetched": issues_count,
+        "cached_successfully": True
+    })
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_repo(request: AnalyzeRequest):
+@app.post(
+    "/analyze",
+    responses={200: {"model": AnalyzeResponse, "content": {"text/plain": {}}}}
+)
+async def analyze_repo(request: AnalyzeRequest, background_tasks: BackgroundTasks, stream: bool = False):
     """
     Analyze cached issues for a repository using LLM
     
     - **repo**: GitHub repository in format 'owner/repository-name'
     - **prompt**: Natural language prompt describing what analysis you want
+    - **stream**: Query parameter; if true, the analysis is streamed back as
+      plain text while it is generated instead of returned as JSON
     """
     repo = request.repo.strip()
     user_prompt = request.prompt.strip()
@@ -148,7 +182,7 @@ async def analyze_repo(request: AnalyzeRequest):
         )
     
     # Check if repo has been scanned
-    if not repo_exists_in_cache(repo):
+    if not await asyncio.to_thread(repo_exists_in_cache, repo):
         logger.error(f"Repo not scanned: {repo}")
         raise HTTPException(
             status_code=400,
@@ -160,8 +194,8 @@ async def analyze_repo(request: AnalyzeRequest):
     
     logger.info(f"Analyzing repository: {repo}")
     
-    # Get cached issues
-    issues = get_cached_issues(repo)
+    # Get the most recent cached issues (context limit applied in SQL)
+    issues = await asyncio.to_thread(get_cached_issues, repo, MAX_ISSUES_FOR_ANALYSIS)
     
     if issues is None:
         logger.error(f"Failed to retrieve cached issues for repo: {repo}")
@@ -174,12 +208,25 @@ async def analyze_repo(request: AnalyzeRequest):
         )
     
     if len(issues) == 0:
-        return AnalyzeResponse(
-            analysis=f"The repository '{repo}' has no open issues to analyze."
-        )
+        analysis = f"The repository '{repo}' has no open issues to analyze."
+        if stream:
+            return PlainTextResponse(analysis)
+        return DefaultResponse({"analysis": analysis})
+    
+    # Reuse a previous analysis of the same issues and prompt
+    cache_key = analysis_cache_key(repo, user_prompt, issues)
+    cached_analysis = await asyncio.to_thread(get_cached_analysis, cache_key, ANALYSIS_CACHE_TTL)
+    if cached_analysis is not None:
+        logger.info(f"Serving cached analysis for repo: {repo}")
+        if stream:
+            return PlainTextResponse(cached_analysis)
+        return DefaultResponse({"analysis": cached_analysis})
+    
+    if stream:
+        return await stream_analyze_response(repo, issues, user_prompt, cache_key, background_tasks)
     
     # Analyze with LLM
-    result = analyze_issues(issues, user_prompt)
+    result = await asyncio.to_thread(analyze_issues, issues, user_prompt)
     
     if not result["success"]:
         logger.error(f"LLM analysis failed: {result['error']}")
@@ -193,7 +240,58 @@ async def analyze_repo(request: AnalyzeRequest):
     
     logger.info(f"Successfully analyzed {len(issues)} issues for repo: {repo}")
     
-    return AnalyzeResponse(analysis=result["analysis"])
+    await asyncio.to_thread(cache_analysis, cache_key, result["analysis"])
+    background_tasks.add_task(purge_expired_analyses, ANALYSIS_CACHE_TTL)
+    
+    return DefaultResponse({"analysis": result["analysis"]})
+
+
+async def stream_analyze_response(
+    repo: str,
+    issues: List[Tuple[str, str, str, str]],
+    user_prompt: str,
+    cache_key: str,
+    background_tasks: BackgroundTasks
+) -> StreamingResponse:
+    """Stream a fresh LLM analysis, caching the full text once it completes"""
+    result = await asyncio.to_thread(stream_analysis, issues, user_prompt)
+    
+    if not result["success"]:
+        logger.error(f"LLM analysis failed: {result['error']}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": result["error"],
+                "details": "Failed to analyze issues with LLM"
+            }
+        )
+    
+    def relay() -> Iterator[str]:
+        # Sync generator: Starlette iterates it in a worker thread
+        parts = []
+        try:
+            for text in result["stream"]:
+                parts.append(text)
+                yield text
+        except Exception as e:
+            # Headers are already sent, so the stream just ends early
+            logger.error(f"LLM stream interrupted for repo {repo}: {e}")
+            return
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            result["stream"].close()
+        
+        analysis = "".join(parts)
+        if not analysis:
+            logger.warning(f"LLM returned an empty analysis for repo: {repo}")
+            return
+        
+        logger.info(f"Successfully streamed analysis of {len(issues)} issues for repo: {repo}")
+        cache_analysis(cache_key, analysis)
+    
+    background_tasks.add_task(purge_expired_analyses, ANALYSIS_CACHE_TTL)
+    
+    return StreamingResponse(relay(), media_type="text/plain")
 
 
 if __name__ == "__main__":
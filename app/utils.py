@@ -1,5 +1,11 @@
 """Utility functions"""
 import logging
+import re
+from functools import lru_cache
+
+# GitHub owner and repository names: letters, digits, '-', '_' and '.',
+# but never '.' or '..', which would walk out of the /repos/ API path
+_REPO_RE = re.compile(r'(?!\.\.?/)[A-Za-z0-9_.\-]+/(?!\.\.?$)[A-Za-z0-9_.\-]+')
 
 
 def setup_logging() -> None:
@@ -11,6 +17,7 @@ def setup_logging() -> None:
     )
 
 
+@lru_cache(maxsize=1024)
 def validate_repo_format(repo: str) -> bool:
     """
     Validate that repo string is in correct 'owner/repo' format
@@ -21,7 +28,6 @@ def validate_repo_format(repo: str) -> bool:
     Returns:
         True if valid format
     """
-    parts = repo.split('/')
-    return len(parts) == 2 and all(part.strip() for part in parts)
+    return _REPO_RE.fullmatch(repo) is not None
 
 
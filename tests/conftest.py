@@ -0,0 +1,19 @@
+"""Shared pytest fixtures"""
+import os
+
+import pytest
+
+# Always keep tests off any on-disk database, even one exported in the shell;
+# must be set before app modules import
+os.environ["DATABASE_PATH"] = "file:test?mode=memory&cache=shared"
+
+from app import database  # noqa: E402
+
+
+@pytest.fixture
+def temp_db():
+    """Fresh in-memory database, discarded when the test ends"""
+    database.close_db()
+    database.init_db()
+    yield
+    database.close_db()
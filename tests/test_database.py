@@ -0,0 +1,103 @@
+"""Tests for SQLite caching helpers"""
+import pytest
+
+from app import database
+
+
+pytestmark = pytest.mark.usefixtures("temp_db")
+
+
+def make_issue(issue_id, created_at="2024-01-01T00:00:00Z", body="Body"):
+    return {
+        "id": issue_id,
+        "title": f"Issue {issue_id}",
+        "body": body,
+        "html_url": f"https://github.com/owner/repo/issues/{issue_id}",
+        "created_at": created_at
+    }
+
+
+def test_cache_issues_replaces_previous_scan():
+    """Test that re-caching a repo drops issues that are no longer open"""
+    assert database.cache_issues("owner/repo", [make_issue(1), make_issue(2)])
+    assert database.cache_issues("owner/repo", [make_issue(2), make_issue(3, body=None)])
+    
+    issues = database.get_cached_issues("owner/repo")
+    assert sorted(title for title, _, _, _ in issues) == ["Issue 2", "Issue 3"]
+    assert all(body is not None for _, body, _, _ in issues)
+
+
+def test_cache_issues_keeps_unchanged_pages():
+    """Test that issues on pages GitHub reported unchanged survive a re-scan"""
+    page_1 = {**make_issue(1), "page": 1}
+    page_2 = {**make_issue(2), "page": 2}
+    database.cache_issues("owner/repo", [page_1, page_2], page_etags=[
+        (1, '"a"', 2, 1),
+        (2, '"b"', 2, 1),
+    ])
+    
+    changed = {**make_issue(3), "page": 1}
+    assert database.cache_issues("owner/repo", [changed], unchanged_pages=[2], page_etags=[
+        (1, '"c"', 2, 1),
+        (2, '"b"', 2, 1),
+    ])
+    
+    issues = database.get_cached_issues("owner/repo")
+    assert sorted(title for title, _, _, _ in issues) == ["Issue 2", "Issue 3"]
+    assert database.get_page_etags("owner/repo") == {1: ('"c"', 2, 1), 2: ('"b"', 2, 1)}
+
+
+def test_get_cached_issues_limit_returns_newest():
+    """Test that the limit keeps only the most recent issues"""
+    database.cache_issues("owner/repo", [
+        make_issue(1, created_at="2024-01-01T00:00:00Z"),
+        make_issue(2, created_at="2024-03-01T00:00:00Z"),
+        make_issue(3, created_at="2024-02-01T00:00:00Z"),
+    ])
+    
+    issues = database.get_cached_issues("owner/repo", limit=2)
+    assert [title for title, _, _, _ in issues] == ["Issue 2", "Issue 3"]
+
+
+def test_init_db_enables_wal(tmp_path, monkeypatch):
+    """Test that the database file is switched to write-ahead logging"""
+    database.close_db()
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+    with database.get_db_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_analysis_cache_round_trip_and_purge():
+    """Test that cached analyses are returned until they expire"""
+    assert database.cache_analysis("key", "Analysis text")
+    assert database.get_cached_analysis("key", max_age_seconds=60) == "Analysis text"
+    assert database.get_cached_analysis("missing", max_age_seconds=60) is None
+    
+    with database.get_db_connection() as conn:
+        conn.execute("UPDATE analysis_cache SET created_at = datetime('now', '-2 hours')")
+    assert database.get_cached_analysis("key", max_age_seconds=3600) is None
+    
+    database.purge_expired_analyses(max_age_seconds=3600)
+    with database.get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0] == 0
+
+
+def test_repo_exists_in_cache():
+    """Test cache membership checks"""
+    assert not database.repo_exists_in_cache("owner/repo")
+    database.cache_issues("owner/repo", [make_issue(1)])
+    assert database.repo_exists_in_cache("owner/repo")
+
+
+def test_recent_issues_query_uses_compound_index():
+    """Test newest-first reads are served by idx_repo_created without a sort"""
+    with database.get_db_connection() as conn:
+        plan = " ".join(row[3] for row in conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT title, body, html_url, created_at FROM issues
+            WHERE repo = ? ORDER BY created_at DESC LIMIT 100
+        """, ("owner/repo",)))
+    
+    assert "idx_repo_created" in plan
+    assert "TEMP B-TREE" not in plan
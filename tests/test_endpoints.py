@@ -1,10 +1,29 @@
 """Basic tests for API endpoints"""
+from types import SimpleNamespace
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from app import database, github_client, llm_client
+from app.llm_client import analysis_cache_key, MAX_ISSUES_FOR_ANALYSIS
 from app.main import app
 
 client = TestClient(app)
 
+# Every endpoint reads the cache, so give each test a freshly created schema
+pytestmark = pytest.mark.usefixtures("temp_db")
+
+
+def make_issue(issue_id=1, title="Crash on start"):
+    """Build a GitHub issue payload for owner/repo"""
+    return {
+        "id": issue_id,
+        "title": title,
+        "body": "Stack trace",
+        "html_url": f"https://github.com/owner/repo/issues/{issue_id}",
+        "created_at": "2024-01-01T00:00:00Z"
+    }
+
 
 def test_root_endpoint():
     """Test health check endpoint"""
@@ -63,8 +82,120 @@ def test_analyze_empty_prompt():
     print("✅ Empty prompt validation passed")
 
 
+def test_analyze_serves_cached_analysis(monkeypatch):
+    """Test analyze returns a cached analysis without calling the LLM"""
+    def no_llm():
+        raise AssertionError("cached analysis should not reach Groq")
+    
+    monkeypatch.setattr(llm_client, "get_groq_client", no_llm)
+    database.cache_issues("owner/repo", [make_issue()])
+    issues = database.get_cached_issues("owner/repo", MAX_ISSUES_FOR_ANALYSIS)
+    database.cache_analysis(analysis_cache_key("owner/repo", "Summarize", issues), "Cached summary")
+    
+    response = client.post(
+        "/analyze",
+        json={"repo": "owner/repo", "prompt": "Summarize"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"analysis": "Cached summary"}
+    print("✅ Cached analysis passed")
+
+
+def test_rescan_keeps_issues_on_unchanged_pages(monkeypatch):
+    """Test a re-scan answered with 304s keeps the cached issues"""
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"v1"'}, json=[make_issue()])
+    
+    monkeypatch.setattr(github_client, "_client", httpx.AsyncClient(
+        base_url=github_client.GITHUB_API_BASE,
+        transport=httpx.MockTransport(handler)
+    ))
+    
+    for _ in range(2):
+        response = client.post("/scan", json={"repo": "owner/repo"})
+        assert response.status_code == 200
+        assert response.json()["issues_fetched"] == 1
+    
+    issues = database.get_cached_issues("owner/repo")
+    assert [title for title, _, _, _ in issues] == ["Crash on start"]
+    print("✅ Conditional re-scan passed")
+
+
+class FakeStream:
+    """Stand-in for a streamed Groq completion that records being closed"""
+    
+    def __init__(self, texts):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+            for text in texts
+        ]
+        self.closed = False
+    
+    def __iter__(self):
+        return iter(self.chunks)
+    
+    def close(self):
+        self.closed = True
+
+
+def use_streamed_completion(monkeypatch, texts):
+    """Seed a cached repo and make Groq stream back the given texts"""
+    database.cache_issues("owner/repo", [make_issue()])
+    stream = FakeStream(texts)
+    
+    def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+    
+    groq = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_client, "get_groq_client", lambda: groq)
+    return stream
+
+
+def test_analyze_stream_caches_full_analysis(monkeypatch):
+    """Test streamed analysis is returned as text and cached for later calls"""
+    stream = use_streamed_completion(monkeypatch, ["Mostly ", "crashes", None])
+    
+    response = client.post(
+        "/analyze?stream=true",
+        json={"repo": "owner/repo", "prompt": "Summarize"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text == "Mostly crashes"
+    assert stream.closed
+    
+    response = client.post(
+        "/analyze",
+        json={"repo": "owner/repo", "prompt": "Summarize"}
+    )
+    assert response.json() == {"analysis": "Mostly crashes"}
+    print("✅ Streamed analysis passed")
+
+
+def test_analyze_stream_does_not_cache_empty_analysis(monkeypatch):
+    """Test an empty streamed analysis is not served from the cache later"""
+    stream = use_streamed_completion(monkeypatch, [])
+    
+    response = client.post(
+        "/analyze?stream=true",
+        json={"repo": "owner/repo", "prompt": "Summarize"}
+    )
+    assert response.status_code == 200
+    assert response.text == ""
+    assert stream.closed
+    
+    issues = database.get_cached_issues("owner/repo", MAX_ISSUES_FOR_ANALYSIS)
+    cache_key = analysis_cache_key("owner/repo", "Summarize", issues)
+    assert database.get_cached_analysis(cache_key, max_age_seconds=60) is None
+    print("✅ Empty streamed analysis passed")
+
+
 if __name__ == "__main__":
     print("🧪 Running tests...\n")
+    database.init_db()
     test_root_endpoint()
     test_scan_invalid_format()
     test_analyze_before_scan()
@@ -0,0 +1,116 @@
+"""Tests for GitHub issue fetching"""
+import asyncio
+
+import httpx
+import pytest
+
+from app import github_client
+
+
+def use_transport(monkeypatch, handler):
+    """Route the shared client through a mock transport"""
+    client = httpx.AsyncClient(
+        base_url=github_client.GITHUB_API_BASE,
+        transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(github_client, "_client", client)
+
+
+def test_fetch_all_issues_paginates_and_filters_prs(monkeypatch):
+    """Test that every page is fetched, merged in order and PRs dropped"""
+    requested = []
+    
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        headers = {}
+        if page == 1:
+            headers["Link"] = (
+                '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=2>; rel="next", '
+                '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=3>; rel="last"'
+            )
+        return httpx.Response(200, headers=headers, json=[
+            {"id": page * 10, "title": f"Issue {page}"},
+            {"id": page * 10 + 1, "title": f"PR {page}", "pull_request": {}},
+        ])
+    
+    use_transport(monkeypatch, handler)
+    result = asyncio.run(github_client.fetch_all_issues("owner/repo"))
+    
+    assert result["success"]
+    assert [issue["id"] for issue in result["issues"]] == [10, 20, 30]
+    assert sorted(requested) == [1, 2, 3]
+
+
+def test_fetch_all_issues_skips_unchanged_pages(monkeypatch):
+    """Test that a 304 for a previously seen page is reported, not refetched"""
+    conditional = []
+    
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            conditional.append(True)
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"v1"'}, json=[
+            {"id": 1, "title": "Issue 1", "body": None,
+             "html_url": "https://github.com/owner/repo/issues/1",
+             "created_at": "2024-01-01T00:00:00Z", "labels": []},
+        ])
+    
+    use_transport(monkeypatch, handler)
+    first = asyncio.run(github_client.fetch_all_issues("owner/repo"))
+    page_etags = {page: (etag, last_page, count) for page, etag, last_page, count in first["etags"]}
+    second = asyncio.run(github_client.fetch_all_issues("owner/repo", page_etags))
+    
+    assert first["etags"] == [(1, '"v1"', 1, 1)]
+    assert first["issues"][0]["page"] == 1
+    assert "labels" not in first["issues"][0]
+    assert conditional == [True]
+    assert second["success"]
+    assert second["issues"] == []
+    assert second["unchanged_pages"] == [1]
+    assert second["issues_count"] == 1
+    assert second["etags"] == first["etags"]
+
+
+
+def test_fetch_all_issues_follows_next_past_stored_last_page(monkeypatch):
+    """Test that a page added after the last scan is found when page 1 is a 304"""
+    requested = []
+    
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        if page == 1:
+            return httpx.Response(304)
+        headers = {"ETag": f'"p{page}"'}
+        if page == 2:
+            headers["Link"] = (
+                '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=3>; rel="next"'
+            )
+        return httpx.Response(200, headers=headers, json=[
+            {"id": page * 10, "title": f"Issue {page}"},
+        ])
+    
+    use_transport(monkeypatch, handler)
+    page_etags = {1: ('"p1"', 2, 100), 2: ('"old"', 2, 100)}
+    result = asyncio.run(github_client.fetch_all_issues("owner/repo", page_etags))
+    
+    assert result["success"]
+    assert requested[0] == 1 and sorted(requested) == [1, 2, 3]
+    assert [issue["id"] for issue in result["issues"]] == [20, 30]
+    assert result["unchanged_pages"] == [1]
+    assert result["issues_count"] == 102
+    assert result["etags"] == [(1, '"p1"', 3, 100), (2, '"p2"', 3, 1), (3, '"p3"', 3, 1)]
+
+
+@pytest.mark.parametrize("status_code, error", [
+    (403, "rate limit"),
+    (404, "not found"),
+])
+def test_fetch_all_issues_errors(monkeypatch, status_code, error):
+    """Test that GitHub error statuses are reported"""
+    use_transport(monkeypatch, lambda request: httpx.Response(status_code))
+    result = asyncio.run(github_client.fetch_all_issues("owner/repo"))
+    
+    assert not result["success"]
+    assert error in result["error"].lower()
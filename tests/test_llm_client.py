@@ -0,0 +1,152 @@
+"""Tests for LLM prompt formatting"""
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError, AuthenticationError, Groq
+
+from app import llm_client
+from app.llm_client import analysis_cache_key, format_issues_for_llm
+
+
+@pytest.fixture
+def groq_client_cache():
+    """Reset the shared Groq client around a test"""
+    llm_client.close_groq_client()
+    yield
+    llm_client.close_groq_client()
+
+
+def test_format_issues_for_llm():
+    """Test issue rows are numbered, truncated and joined"""
+    issues = [
+        ("First", "x" * 600, "https://github.com/o/r/issues/1", "2024-01-02T00:00:00Z"),
+        ("Second", "", "https://github.com/o/r/issues/2", "2024-01-01T00:00:00Z"),
+    ]
+    
+    text = format_issues_for_llm(issues)
+    
+    assert text == (
+        "Issue #1:\n"
+        "Title: First\n"
+        "Created: 2024-01-02T00:00:00Z\n"
+        "URL: https://github.com/o/r/issues/1\n"
+        f"Description: {'x' * 500}...\n"
+        "---\n\n"
+        "Issue #2:\n"
+        "Title: Second\n"
+        "Created: 2024-01-01T00:00:00Z\n"
+        "URL: https://github.com/o/r/issues/2\n"
+        "Description: No description provided\n"
+        "---"
+    )
+
+
+def test_analysis_cache_key_tracks_prompt_and_issues():
+    """Test that the cache key changes with the prompt or issue content"""
+    issues = [("Title", None, "https://github.com/o/r/issues/1", "2024-01-01T00:00:00Z")]
+    edited = [("Title", "Edited", "https://github.com/o/r/issues/1", "2024-01-01T00:00:00Z")]
+    
+    key = analysis_cache_key("o/r", "Summarize", issues)
+    
+    assert key == analysis_cache_key("o/r", "Summarize", list(issues))
+    assert key != analysis_cache_key("o/r", "Prioritize", issues)
+    assert key != analysis_cache_key("o/r", "Summarize", edited)
+
+
+def test_get_groq_client_is_shared(monkeypatch, groq_client_cache):
+    """Test the Groq client is created lazily and reused"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    
+    client = llm_client.get_groq_client()
+    
+    assert isinstance(client, Groq)
+    assert llm_client.get_groq_client() is client
+
+
+def test_get_groq_client_picks_up_key_set_later(monkeypatch, groq_client_cache):
+    """Test a missing API key is not remembered once it is configured"""
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    assert llm_client.get_groq_client() is None
+    
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    assert isinstance(llm_client.get_groq_client(), Groq)
+
+
+def test_analyze_issues_without_api_key(monkeypatch, groq_client_cache):
+    """Test analysis fails cleanly when no API key is configured"""
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    
+    result = llm_client.analyze_issues([], "Summarize")
+    
+    assert not result["success"]
+    assert result["error"] == "Groq API key not configured"
+
+
+class FakeCompletions:
+    """Stand-in for client.chat.completions that fails a set number of times"""
+    
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        message = SimpleNamespace(content="Analysis")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def use_completions(monkeypatch, completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(llm_client, "get_groq_client", lambda: client)
+
+
+def test_analyze_issues_backs_off_on_transient_errors(monkeypatch):
+    """Test transient Groq failures are retried after a growing delay"""
+    request = httpx.Request("POST", "https://api.groq.com")
+    completions = FakeCompletions([APIConnectionError(request=request)] * 2)
+    use_completions(monkeypatch, completions)
+    delays = []
+    monkeypatch.setattr(llm_client.time, "sleep", delays.append)
+    
+    result = llm_client.analyze_issues([], "Summarize")
+    
+    assert result["success"]
+    assert result["analysis"] == "Analysis"
+    assert completions.calls == 3
+    assert len(delays) == 2
+    assert delays[0] < delays[1] <= llm_client.RETRY_MAX_DELAY + llm_client.RETRY_BASE_DELAY
+
+
+def test_analyze_issues_rate_limit_request_count(monkeypatch, groq_client_cache):
+    """Test a persistent 429 costs one HTTP request per attempt, with no SDK retries"""
+    requests = []
+    
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(429, json={"error": {"message": "Rate limited"}})
+    
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(httpx, "HTTPTransport", lambda **kwargs: transport)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client.time, "sleep", lambda delay: None)
+    
+    result = llm_client.analyze_issues([], "Summarize")
+    
+    assert not result["success"]
+    assert len(requests) == llm_client.GROQ_MAX_ATTEMPTS
+
+
+def test_analyze_issues_does_not_retry_client_errors(monkeypatch):
+    """Test non-transient Groq failures are reported without retrying"""
+    response = httpx.Response(401, request=httpx.Request("POST", "https://api.groq.com"))
+    completions = FakeCompletions([AuthenticationError("bad key", response=response, body=None)])
+    use_completions(monkeypatch, completions)
+    monkeypatch.setattr(llm_client.time, "sleep", lambda delay: None)
+    
+    result = llm_client.analyze_issues([], "Summarize")
+    
+    assert not result["success"]
+    assert completions.calls == 1
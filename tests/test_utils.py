@@ -0,0 +1,31 @@
+"""Tests for utility functions"""
+import pytest
+
+from app.utils import validate_repo_format
+
+
+@pytest.mark.parametrize("repo", [
+    "microsoft/vscode-python",
+    "a.b/c_d",
+    "owner/.github",
+])
+def test_validate_repo_format_accepts_owner_and_name(repo):
+    """Test that ordinary owner/repo names are accepted"""
+    assert validate_repo_format(repo)
+
+
+@pytest.mark.parametrize("repo", [
+    "owner",
+    "owner repo/name",
+    "owner/repo name",
+    "a/b/c",
+    "/b",
+    "a/",
+    "../..",
+    "./x",
+    "x/.",
+    "x/..",
+])
+def test_validate_repo_format_rejects_invalid_names(repo):
+    """Test that spaces, extra slashes and dot segments are rejected"""
+    assert not validate_repo_format(repo)